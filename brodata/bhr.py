@@ -3,9 +3,9 @@ import logging
 import tempfile
 
 import pandas as pd
-import requests
 
 from . import bro
+from .util import _get_session
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +22,8 @@ class _BoreholeResearch(bro.FileOrUrl):
         if len(bhrs) != 1:
             raise (Exception(f"Only one {self._object_name} supported"))
         bhr = bhrs[0]
-        for key in bhr.attrib:
-            setattr(self, key.split("}", 1)[1], bhr.attrib[key])
+        for key, value in bhr.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in bhr:
             key = child.tag.split("}", 1)[1]
             if len(child) == 0:
@@ -224,7 +224,7 @@ def bhrgt_graph(
         params["bottomNap"] = bottomNap
 
     with open(xml_file, "rb") as data:
-        r = requests.post(url, data=data, timeout=timeout, params=params)
+        r = _get_session().post(url, data=data, timeout=timeout, params=params)
     r.raise_for_status()
     if to_file is None:
         to_file = tempfile.NamedTemporaryFile(suffix=".svg").name
@@ -1,26 +1,59 @@
 import logging
 import os
+import threading
 import types
-import xml
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from io import StringIO
 from zipfile import ZipFile
 
+from lxml import etree
 from shapely.geometry import Point, MultiPoint
 import numpy as np
-import geopandas as gpd
 import pandas as pd
-import requests
-from pyproj import Transformer
 from tqdm import tqdm
 
 from .util import (
     _format_repr,
+    _get_session,
     _save_data_to_zip,
 )
 
 logger = logging.getLogger(__name__)
 
+# XML-namespaces used by the BRO-webservices, defined once so they are not rebuilt on
+# every call to the parse-methods below
+_NS_BROCOM = {"brocom": "http://www.broservices.nl/xsd/brocommon/3.0"}
+_NS_GML = {"gml": "http://www.opengis.net/gml/3.2"}
+_NS_SWE = {"swe": "http://www.opengis.net/swe/2.0"}
+
+_local = threading.local()
+
+
+def _get_parser():
+    """Return a thread-local parser that drops comment-nodes.
+
+    lxml keeps comments by default, where xml.etree silently dropped them; the
+    parse-methods assume every node has a string tag. Parsers are not
+    thread-safe, so each download-worker gets its own.
+    """
+    parser = getattr(_local, "xml_parser", None)
+    if parser is None:
+        parser = etree.XMLParser(remove_comments=True)
+        _local.xml_parser = parser
+    return parser
+
+
+@lru_cache(maxsize=512)
+def _tag_name(tag):
+    """Strip the namespace from an element- or attribute-tag.
+
+    ElementTree interns the tag-strings, so for large documents nearly every call is
+    a cache-hit, which saves a string-split per element in the parse loops.
+    """
+    return tag.rpartition("}")[2]
+
 
 # %%
 def _get_bro_ids_of_bronhouder(cl, bronhouder):
@@ -44,7 +77,7 @@ def _get_bro_ids_of_bronhouder(cl, bronhouder):
     """
     url = f"{cl._rest_url}/bro-ids?"
     params = dict(bronhouder=bronhouder)
-    req = requests.get(url, params=params)
+    req = _get_session().get(url, params=params)
     if req.status_code > 200:
         logger.error(req.json()["errors"][0]["message"])
         return
@@ -148,6 +181,9 @@ def _get_characteristics(
         if (x is None or y is None) and extent is None:
             raise (Exception("Please specify either extent or x, y and radius"))
 
+        # only import pyproj when a request needs to be transformed
+        from pyproj import Transformer
+
         transformer = Transformer.from_crs(epsg, 4326)
         data["area"] = {}
         if x is not None and y is not None:
@@ -171,34 +207,35 @@ def _get_characteristics(
                 "lowerCorner": {"lat": lat_ll, "lon": lon_ll},
                 "upperCorner": {"lat": lat_ur, "lon": lon_ur},
             }
-        req = requests.post(url, json=data, timeout=timeout)
+        req = _get_session().post(url, json=data, timeout=timeout)
         if req.status_code > 200:
-            root = xml.etree.ElementTree.fromstring(req.text)
+            root = etree.fromstring(req.content, _get_parser())
             FileOrUrl._check_for_rejection(root)
             # if reading of the rejection message failed, raise a more general error
             raise (Exception((f"Retieving data from {url} failed")))
 
         if to_file is not None:
-            with open(to_file, "w") as f:
-                f.write(req.text)
+            # write the undecoded bytes, so no text decode/encode round-trip is needed
+            with open(to_file, "wb") as f:
+                f.write(req.content)
 
         # read results
-        tree = xml.etree.ElementTree.fromstring(req.text)
+        tree = etree.fromstring(req.content, _get_parser())
     else:
         if zipfile is not None:
             with zipfile.open(to_file) as f:
-                tree = xml.etree.ElementTree.parse(f).getroot()
+                tree = etree.parse(f, _get_parser()).getroot()
         else:
-            tree = xml.etree.ElementTree.parse(to_file).getroot()
+            tree = etree.parse(to_file, _get_parser()).getroot()
 
     ns = {"xmlns": cl._xmlns}
     data = []
     for gmw in tree.findall(f".//xmlns:{cl._char}", ns):
         d = {}
-        for key in gmw.attrib:
-            d[key.split("}", 1)[1]] = gmw.attrib[key]
+        for key, value in gmw.attrib.items():
+            d[_tag_name(key)] = value
         for child in gmw:
-            key = child.tag.split("}", 1)[1]
+            key = _tag_name(child.tag)
             if len(child) == 0:
                 d[key] = child.text
             elif key == "standardizedLocation":
@@ -213,22 +250,22 @@ def _get_characteristics(
                 d[key] = child[0].text
             elif key in ["diameterRange", "screenPositionRange"]:
                 for grandchild in child:
-                    key = grandchild.tag.split("}", 1)[1]
+                    key = _tag_name(grandchild.tag)
                     d[key] = grandchild.text
             elif key == "licence":
                 for grandchild in child:
-                    key2 = grandchild.tag.split("}", 1)[1]
+                    key2 = _tag_name(grandchild.tag)
                     for greatgrandchild in grandchild:
-                        key3 = greatgrandchild.tag.split("}", 1)[1]
+                        key3 = _tag_name(greatgrandchild.tag)
                         if key3 == "identificationLicence":
                             d[key] = greatgrandchild.text
                         else:
                             logger.warning(f"Unknown key: {key2}")
             elif key == "realisedInstallation":
                 for grandchild in child:
-                    key2 = grandchild.tag.split("}", 1)[1]
+                    key2 = _tag_name(grandchild.tag)
                     for greatgrandchild in grandchild:
-                        key3 = greatgrandchild.tag.split("}", 1)[1]
+                        key3 = _tag_name(greatgrandchild.tag)
                         if key3 == "installationFunction":
                             d[key] = greatgrandchild.text
                         else:
@@ -292,19 +329,38 @@ def _get_data_in_extent(
     )
 
     data = {}
-    for bro_id in tqdm(char.index, disable=silent):
-        if zipfile is not None:
+    if zipfile is not None:
+        # a zipfile cannot be read from multiple threads
+        for bro_id in tqdm(char.index, disable=silent):
             fname = f"{bro_id}.xml"
             data[bro_id] = bro_cl(fname, zipfile=zipfile)
-            continue
-        if to_path is not None:
-            to_file = os.path.join(to_path, f"{bro_id}.xml")
-            if to_zip is not None:
-                _files.append(to_file)
-            if not redownload and os.path.isfile(to_file):
-                data[bro_id] = bro_cl(to_file)
-                continue
-        data[bro_id] = bro_cl.from_bro_id(bro_id, to_file=to_file, timeout=timeout)
+    else:
+        tasks = []
+        for bro_id in char.index:
+            to_file = None
+            if to_path is not None:
+                to_file = os.path.join(to_path, f"{bro_id}.xml")
+                if to_zip is not None:
+                    _files.append(to_file)
+            tasks.append((bro_id, to_file))
+
+        def _get_object(bro_id, to_file):
+            if to_file is not None and not redownload and os.path.isfile(to_file):
+                return bro_cl(to_file)
+            return bro_cl.from_bro_id(bro_id, to_file=to_file, timeout=timeout)
+
+        if len(tasks) > 0:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                futures = {
+                    executor.submit(_get_object, bro_id, to_file): bro_id
+                    for bro_id, to_file in tasks
+                }
+                for future in tqdm(
+                    as_completed(futures), total=len(futures), disable=silent
+                ):
+                    data[futures[future]] = future.result()
+            # restore the order of the characteristics
+            data = {bro_id: data[bro_id] for bro_id, _ in tasks}
     if zipfile is not None:
         zipfile.close()
     if zipfile is None and to_zip is not None:
@@ -325,18 +381,25 @@ def objects_to_gdf(
 ):
     if not to_gdf:
         return data
-    if isinstance(data, list):
+    # only import geopandas when a GeoDataFrame is actually constructed
+    import geopandas as gpd
+
+    if isinstance(data, pd.DataFrame):
+        df = data
+    elif isinstance(data, list):
         df = pd.DataFrame(data)
     else:
-        df = pd.DataFrame([data[key].to_dict() for key in data])
+        # from_records handles the list of dicts in one pass
+        df = pd.DataFrame.from_records([data[key].to_dict() for key in data])
 
     if index is not None and not df.empty:
+        # set the index in place, so no intermediate frame is allocated
         if isinstance(index, str):
             if index in df.columns:
-                df = df.set_index(index)
+                df.set_index(index, inplace=True)
         elif np.all([x in df.columns for x in index]):
             # we assume index is an iterable (list), to form a MultiIndex
-            df = df.set_index(index)
+            df.set_index(index, inplace=True)
     if geometry is None:
         if "deliveredLocation" in df:
             geometry = "deliveredLocation"
@@ -348,7 +411,7 @@ def objects_to_gdf(
                 from_crs = 4258
         else:
             return df
-    gdf = gpd.GeoDataFrame(df, geometry=geometry, crs=from_crs)
+    gdf = gpd.GeoDataFrame(df, geometry=geometry, crs=from_crs, copy=False)
     if to_crs is not None and from_crs is not None and to_crs != from_crs:
         gdf = gdf.to_crs(to_crs)
     return gdf
@@ -414,29 +477,24 @@ class FileOrUrl(ABC):
         # XML or URL
         else:
             if zipfile is not None:
-                root = xml.etree.ElementTree.fromstring(zipfile.read(url_or_file))
+                root = etree.fromstring(zipfile.read(url_or_file), _get_parser())
             elif url_or_file.startswith("http"):
                 if redownload or to_file is None or not os.path.isfile(to_file):
-                    if max_retries > 1:
-                        adapter = requests.adapters.HTTPAdapter(max_retries=max_retries)
-                        session = requests.Session()
-                        session.mount("https://", adapter)
-                        req = session.get(url_or_file, timeout=timeout)
-                    else:
-                        req = requests.get(url_or_file, timeout=timeout)
+                    req = _get_session(max_retries).get(url_or_file, timeout=timeout)
                     if not req.ok:
                         # msg = req.json()["errors"][0]["message"]
                         raise Exception(f"Retrieving data from {url_or_file} failed")
                     if to_file is not None:
-                        with open(to_file, "w") as f:
-                            f.write(req.text)
-                    root = xml.etree.ElementTree.fromstring(req.text)
+                        # write the undecoded bytes, skipping the text round-trip
+                        with open(to_file, "wb") as f:
+                            f.write(req.content)
+                    root = etree.fromstring(req.content, _get_parser())
                     FileOrUrl._check_for_rejection(root)
                 else:
-                    tree = xml.etree.ElementTree.parse(to_file)
+                    tree = etree.parse(to_file, _get_parser())
                     root = tree.getroot()
             else:
-                tree = xml.etree.ElementTree.parse(url_or_file)
+                tree = etree.parse(url_or_file, _get_parser())
                 root = tree.getroot()
 
             self._read_contents(root, **kwargs)
@@ -479,7 +537,7 @@ class FileOrUrl(ABC):
 
     @staticmethod
     def _check_for_rejection(tree):
-        ns = {"brocom": "http://www.broservices.nl/xsd/brocommon/3.0"}
+        ns = _NS_BROCOM
         response_type = tree.find("brocom:responseType", ns)
         if response_type.text == "rejection":
             criterionError = tree.find("brocom:criterionError", ns)
@@ -494,17 +552,17 @@ class FileOrUrl(ABC):
             to_float = [to_float]
         if to_int is not None and isinstance(to_int, str):
             to_int = [to_int]
-        if len(node) == 0:
-            key = node.tag.split("}", 1)[1]
-            if d is None:
-                setattr(self, key, FileOrUrl._parse_text(node, key, to_float, to_int))
-            else:
-                d[key] = FileOrUrl._parse_text(node, key, to_float, to_int)
-        else:
-            for child in node:
-                self._read_children_of_children(
-                    child, d=d, to_float=to_float, to_int=to_int
-                )
+        # walk the leaves of the subtree in one iter()-pass, instead of a
+        # python-level recursion (re-normalizing the arguments) per descendant
+        for leaf in node.iter():
+            if len(leaf) == 0:
+                key = _tag_name(leaf.tag)
+                if d is None:
+                    setattr(
+                        self, key, FileOrUrl._parse_text(leaf, key, to_float, to_int)
+                    )
+                else:
+                    d[key] = FileOrUrl._parse_text(leaf, key, to_float, to_int)
 
     @staticmethod
     def _parse_text(node, key, to_float=None, to_int=None):
@@ -516,7 +574,7 @@ class FileOrUrl(ABC):
 
     def _read_delivered_location(self, node):
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = _tag_name(child.tag)
             if key == "location":
                 setattr(self, "deliveredLocation", self._read_pos(child))
             elif key == "horizontalPositioningDate":
@@ -528,7 +586,7 @@ class FileOrUrl(ABC):
 
     def _read_standardized_location(self, node):
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = _tag_name(child.tag)
             if key == "location":
                 setattr(self, "standardizedLocation", self._read_pos(child))
             elif key == "coordinateTransformation":
@@ -538,7 +596,7 @@ class FileOrUrl(ABC):
 
     @staticmethod
     def _read_pos(node):
-        ns = {"gml": "http://www.opengis.net/gml/3.2"}
+        ns = _NS_GML
         multipoint = node.find("gml:MultiPoint", ns)
         if multipoint is not None:
             xy = []
@@ -549,7 +607,7 @@ class FileOrUrl(ABC):
         if point is not None:
             node = point
         pos = node.find("gml:pos", ns)
-        x, y = [float(x) for x in pos.text.split()]
+        x, y = map(float, pos.text.split())
         if "srsName" in node.attrib:
             if node.attrib["srsName"] == "urn:ogc:def:crs:EPSG::4258":
                 x, y = y, x
@@ -557,7 +615,7 @@ class FileOrUrl(ABC):
 
     @staticmethod
     def _read_date(node):
-        ns = {"brocom": "http://www.broservices.nl/xsd/brocommon/3.0"}
+        ns = _NS_BROCOM
         date = node.find("brocom:date", ns)
         if date is None:
             date = node.find("brocom:yearMonth", ns)
@@ -569,7 +627,7 @@ class FileOrUrl(ABC):
 
     @staticmethod
     def _read_time_instant(node):
-        ns = {"gml": "http://www.opengis.net/gml/3.2"}
+        ns = _NS_GML
         time_instant = node.find("gml:TimeInstant", ns)
         time_position = time_instant.find("gml:timePosition", ns)
         return pd.to_datetime(time_position.text)
@@ -621,7 +679,7 @@ def get_brondocumenten_per_bronhouder(index=("kvk", "type"), timeout=5, **kwargs
 
     """
     url = "https://bromonitor.nl/api/rapporten/brondocumenten-per-bronhouder"
-    r = requests.get(url, timeout=timeout)
+    r = _get_session().get(url, timeout=timeout)
     if not r.ok:
         raise (Exception("Download of brondocumenten per bronhouder failed"))
     df = pd.DataFrame(r.json()["data"], **kwargs)
@@ -4,9 +4,9 @@ from functools import partial
 from io import StringIO
 
 import pandas as pd
-import requests
 
 from . import bro
+from .util import _get_session
 
 logger = logging.getLogger(__name__)
 
@@ -15,24 +15,25 @@ class ConePenetrationTest(bro.FileOrUrl):
     _rest_url = "https://publiek.broservices.nl/sr/cpt/v1"
     _xmlns = "http://www.broservices.nl/xsd/dscpt/1.1"
     _char = "CPT_C"
+    _ns = {
+        **bro._NS_BROCOM,
+        **bro._NS_GML,
+        "cptcommon": "http://www.broservices.nl/xsd/cptcommon/1.1",
+        "xmlns": _xmlns,
+    }
 
     def _read_contents(self, tree):
-        ns = {
-            "brocom": "http://www.broservices.nl/xsd/brocommon/3.0",
-            "gml": "http://www.opengis.net/gml/3.2",
-            "cptcommon": "http://www.broservices.nl/xsd/cptcommon/1.1",
-            "xmlns": self._xmlns,
-        }
+        ns = self._ns
         cpts = tree.findall(".//xmlns:CPT_O", ns)
         if len(cpts) > 1:
             raise (Exception("Only one CPT_0 supported"))
         elif len(cpts) == 0:
             raise (Exception("No CPT_0 found"))
         cpt = cpts[0]
-        for key in cpt.attrib:
-            setattr(self, key.split("}", 1)[1], cpt.attrib[key])
+        for key, value in cpt.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in cpt:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if len(child) == 0:
                 setattr(self, key, child.text)
             elif key == "standardizedLocation":
@@ -45,7 +46,7 @@ class ConePenetrationTest(bro.FileOrUrl):
                 self._read_children_of_children(child)
             elif key in ["conePenetrometerSurvey"]:
                 for grandchild in child:
-                    key = grandchild.tag.split("}", 1)[1]
+                    key = bro._tag_name(grandchild.tag)
                     if len(grandchild) == 0:
                         setattr(self, key, grandchild.text)
                     elif key in [
@@ -77,12 +78,12 @@ class ConePenetrationTest(bro.FileOrUrl):
     def _read_parameters(self, node):
         self.parameters = pd.Series()
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             self.parameters[key] = child.text
 
     def _read_cone_penetration_test(self, node, name):
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if key in ["phenomenonTime", "resultTime"]:
                 setattr(self, f"{name}_{key}", self._read_time_instant(child))
             elif key in [
@@ -94,12 +95,11 @@ class ConePenetrationTest(bro.FileOrUrl):
                 self._read_children_of_children(child)
             elif key in ["cptResult", "disResult"]:
                 for grandchild in child:
-                    key2 = grandchild.tag.split("}", 1)[1]
+                    key2 = bro._tag_name(grandchild.tag)
                     if key2 == "encoding":
-                        ns = {"swe": "http://www.opengis.net/swe/2.0"}
-                        text_encoding = grandchild.find("swe:TextEncoding", ns)
-                        for key3 in text_encoding.attrib:
-                            setattr(self, f"{name}_{key3}", text_encoding.attrib[key3])
+                        text_encoding = grandchild.find("swe:TextEncoding", bro._NS_SWE)
+                        for key3, value in text_encoding.attrib.items():
+                            setattr(self, f"{name}_{key3}", value)
 
                     elif key2 == "elementCount":
                         pass
@@ -122,7 +122,7 @@ class ConePenetrationTest(bro.FileOrUrl):
 
     def _read_additional_investigation(self, node):
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if len(child) == 0:
                 setattr(self, key, child.text)
             elif key == "removedLayer":
@@ -161,7 +161,7 @@ def get_graph_types(timeout=5):
 
     """
     url = "https://publiek.broservices.nl/sr/cpt/v1/result/graph/types"
-    r = requests.get(url)
+    r = _get_session().get(url)
     supported_graphs = r.json()["supportedGraphs"]
     assert len(supported_graphs) == 1
     return pd.DataFrame(supported_graphs[0]["graphs"]).set_index("graphType")
@@ -198,7 +198,7 @@ def graph(
 
     params = {"graphType": graphType}
     with open(xml_file, "rb") as data:
-        r = requests.post(url, data=data, timeout=timeout, params=params)
+        r = _get_session().post(url, data=data, timeout=timeout, params=params)
     r.raise_for_status()
     if to_file is None:
         to_file = tempfile.NamedTemporaryFile(suffix=".svg").name
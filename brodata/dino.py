@@ -1,5 +1,9 @@
+import hashlib
 import logging
 import os
+import pickle
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO, StringIO, TextIOWrapper
 from pathlib import Path
 from zipfile import ZipFile
@@ -7,13 +11,15 @@ from zipfile import ZipFile
 import numpy as np
 import pandas as pd
 import geopandas as gpd
-import requests
-from shapely.geometry import LineString
+import shapely
 import matplotlib.pyplot as plt
 from tqdm import tqdm
 
 from .util import (
     _format_repr,
+    _get_session,
+    _open_zipfile,
+    _remove_files_again,
     _save_data_to_zip,
 )
 from .webservices import get_configuration, get_gdf
@@ -57,7 +63,14 @@ def objects_to_gdf(
         return objects
 
     # convert a list of dino-objects to a geodataframe
-    df = pd.DataFrame([objects[key].to_dict() for key in objects])
+    df = pd.DataFrame.from_records([obj.to_dict() for obj in objects.values()])
+    if len(objects) > 0:
+        cls = type(next(iter(objects.values())))
+        if hasattr(cls, "_build_geometry"):
+            # build the geometries of all objects in one vectorized pass
+            geoms = cls._build_geometry(df)
+            if geoms is not None:
+                df["geometry"] = geoms
     if geometry is not None:
         if geometry in df.columns:
             geometry = df[geometry]
@@ -100,6 +113,8 @@ def _get_data_within_extent(
     index="NITG-nr",
     to_gdf=True,
     max_retries=2,
+    max_workers=16,
+    cache_dir=None,
 ):
     if isinstance(extent, (str, Path)):
         data = _get_data_from_path(extent, dino_cl, silent=silent)
@@ -140,35 +155,98 @@ def _get_data_within_extent(
         if to_file is not None:
             gdf.to_file(to_file)
 
+    zf = None
+    if to_zip is not None:
+        # write the zipfile on the fly, so the csv-files do not have to be read
+        # back from disk in a separate pass when all downloads are done; write
+        # to a temporary name, so a failing download does not leave a
+        # truncated zipfile behind at to_zip
+        zf_name = str(to_zip) + ".tmp"
+        zf = _open_zipfile(zf_name)
+        zf.write(to_file, os.path.split(to_file)[1])
+
     to_file = None
 
+    # share one session across the whole download loop
+    session = _get_session(max_retries)
     data = {}
-    for dino_nr in tqdm(gdf.index, disable=silent):
-        if to_path is not None:
-            to_file = os.path.join(to_path, f"{dino_nr}.csv")
-            if to_zip is not None:
-                files.append(to_file)
-            if not redownload and os.path.isfile(to_file):
-                data[dino_nr] = dino_cl(to_file)
-                continue
-        data[dino_nr] = dino_cl.from_dino_nr(
-            dino_nr, timeout=timeout, to_file=to_file, max_retries=max_retries
-        )
-    if to_zip is not None:
-        _save_data_to_zip(to_zip, files, remove_path_again, to_path)
+    tasks = []
+    try:
+        for dino_nr in gdf.index:
+            to_file = None
+            if to_path is not None:
+                to_file = os.path.join(to_path, f"{dino_nr}.csv")
+                if to_zip is not None:
+                    files.append(to_file)
+                if not redownload and os.path.isfile(to_file):
+                    data[dino_nr] = dino_cl(to_file)
+                    if zf is not None:
+                        zf.write(to_file, os.path.split(to_file)[1])
+                    continue
+            tasks.append((dino_nr, to_file))
+        # download the files in parallel, as the server spends most time per
+        # request waiting
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    dino_cl.from_dino_nr,
+                    dino_nr,
+                    timeout=timeout,
+                    to_file=to_file,
+                    redownload=redownload,
+                    session=session,
+                    cache_dir=cache_dir,
+                ): (dino_nr, to_file)
+                for dino_nr, to_file in tasks
+            }
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                disable=silent,
+                mininterval=0.5,
+            ):
+                dino_nr, to_file = futures[future]
+                data[dino_nr] = future.result()
+                if zf is not None:
+                    # the file was just written, so it is still in the page cache
+                    zf.write(to_file, os.path.split(to_file)[1])
+    except Exception:
+        if zf is not None:
+            zf.close()
+            os.remove(zf_name)
+        raise
+    # keep the original order of the locations
+    data = {key: data[key] for key in gdf.index if key in data}
+    if zf is not None:
+        zf.close()
+        # only replace the zipfile at to_zip when all downloads succeeded
+        os.replace(zf_name, to_zip)
+        if remove_path_again:
+            _remove_files_again(files, to_path)
 
     return objects_to_gdf(data, x, y, geometry, index, to_gdf)
 
 
-def _get_data_from_path(from_path, dino_class, silent=False, ext=".csv"):
+def _get_data_from_path(from_path, dino_class, silent=False, ext=".csv", max_workers=None):
     if str(from_path).endswith(".zip"):
         return _get_data_from_zip(from_path, dino_class, silent=silent)
-    files = os.listdir(from_path)
-    files = [file for file in files if file.endswith(ext)]
+    files = [entry.name for entry in os.scandir(from_path) if entry.name.endswith(ext)]
+    names = [os.path.splitext(file)[0] for file in files]
+    # parse the files in parallel; pandas releases the GIL in its c-parser
+    if max_workers is None:
+        max_workers = os.cpu_count()
     data = {}
-    for file in tqdm(files, disable=silent):
-        fname = os.path.join(from_path, file)
-        data[os.path.splitext(file)[0]] = dino_class(fname)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(dino_class, os.path.join(from_path, file)): name
+            for file, name in zip(files, names)
+        }
+        for future in tqdm(
+            as_completed(futures), total=len(futures), disable=silent, mininterval=0.5
+        ):
+            data[futures[future]] = future.result()
+    # keep the order in which the files were found
+    data = {name: data[name] for name in names}
     return data
 
 
@@ -186,7 +264,7 @@ def _get_data_from_zip(to_zip, dino_class, silent=False, extent=None):
             gdf = gdf.set_index("DINO_NR")
             gdf = gdf.cx[extent[0] : extent[1], extent[2] : extent[3]]
             names = [f"{name}.csv" for name in gdf.index]
-        for name in tqdm(names, disable=silent):
+        for name in tqdm(names, disable=silent, mininterval=0.5):
             data[name] = dino_class(name, zipfile=zf)
     return data
 
@@ -208,6 +286,8 @@ def get_grondwaterstand(
     to_zip=None,
     redownload=False,
     to_gdf=True,
+    max_workers=16,
+    cache_dir=None,
 ):
     dino_class = Grondwaterstand
     index = ["Locatie", "Filternummer"]
@@ -239,21 +319,49 @@ def get_grondwaterstand(
     to_file = None
     if to_path is not None and not os.path.isdir(to_path):
         os.makedirs(to_path)
+    # share one session across the whole download loop
+    session = _get_session()
     data = {}
-    for name in tqdm(gdf.index, disable=silent):
-        for i_st in range(1, gdf.at[name, "ST_CNT"] + 1):
+    keys = []
+    tasks = []
+    # list the download directory once, instead of a stat-call per piezometer
+    existing = set(os.listdir(to_path)) if to_path is not None else set()
+    for name, st_cnt in gdf["ST_CNT"].items():
+        for i_st in range(1, st_cnt + 1):
             piezometer_nr = f"{i_st:03d}"
+            key = f"{name}_{piezometer_nr}"
+            keys.append(key)
             url = f"{download_url}/{name}/{piezometer_nr}"
+            to_file = None
             if to_path is not None:
-                to_file = os.path.join(to_path, f"{name}_{piezometer_nr}.csv")
+                to_file = os.path.join(to_path, f"{key}.csv")
                 if to_zip is not None:
                     files.append(to_file)
-                if not redownload and os.path.isfile(to_file):
-                    data[f"{name}_{piezometer_nr}"] = dino_class(to_file)
+                if not redownload and f"{key}.csv" in existing:
+                    data[key] = dino_class(to_file)
                     continue
-            data[f"{name}_{piezometer_nr}"] = dino_class(
-                url, timeout=timeout, to_file=to_file
-            )
+            tasks.append((key, url, to_file))
+    # download the files in parallel, as the server spends most time per request
+    # waiting
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                dino_class,
+                url,
+                timeout=timeout,
+                to_file=to_file,
+                redownload=redownload,
+                session=session,
+                cache_dir=cache_dir,
+            ): key
+            for key, url, to_file in tasks
+        }
+        for future in tqdm(
+            as_completed(futures), total=len(futures), disable=silent, mininterval=0.5
+        ):
+            data[futures[future]] = future.result()
+    # keep the original order of the piezometers
+    data = {key: data[key] for key in keys if key in data}
     if to_zip is not None:
         _save_data_to_zip(to_zip, files, remove_path_again, to_path)
     return objects_to_gdf(
@@ -315,19 +423,30 @@ class CsvFileOrUrl:
         to_file=None,
         redownload=True,
         max_retries=2,
+        session=None,
+        cache_dir=None,
     ):
         if zipfile is not None:
             with zipfile.open(url_or_file) as f:
                 self._read_contents(TextIOWrapper(f))
         elif url_or_file.startswith("http"):
+            cache_file = None
+            if cache_dir is not None:
+                # a transparent disk-cache keyed by the url, independent of to_file
+                key = hashlib.sha1(url_or_file.encode()).hexdigest()
+                cache_file = os.path.join(cache_dir, key[:2], key + ".csv")
+                if not redownload and os.path.isfile(cache_file):
+                    if to_file is not None and not os.path.isfile(to_file):
+                        # callers that zip or clean up their files expect
+                        # to_file to exist, also when the cache answers the call
+                        shutil.copyfile(cache_file, to_file)
+                    with open(cache_file, "r", encoding="utf-8") as f:
+                        self._read_contents(f)
+                    return
             if redownload or to_file is None or not os.path.isfile(to_file):
-                if max_retries > 1:
-                    adapter = requests.adapters.HTTPAdapter(max_retries=max_retries)
-                    session = requests.Session()
-                    session.mount("https://", adapter)
-                    req = session.get(url_or_file, timeout=timeout)
-                else:
-                    req = requests.get(url_or_file, timeout=timeout)
+                if session is None:
+                    session = _get_session(max_retries)
+                req = session.get(url_or_file, timeout=timeout, stream=True)
                 if not req.ok:
                     raise (Exception((f"Retieving data from {url_or_file} failed")))
                 is_zipfile = False
@@ -345,16 +464,43 @@ class CsvFileOrUrl:
                                     f.write(myfile.read())
                             self._read_contents(TextIOWrapper(myfile))
                 else:
-                    if to_file is not None:
-                        with open(to_file, "w") as f:
-                            f.write(req.text)
-                    self._read_contents(StringIO(req.text))
+                    if to_file is not None or cache_file is not None:
+                        # stream the payload straight to disk, so it is never held
+                        # in memory as a whole
+                        if cache_file is not None:
+                            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                        fname = to_file if to_file is not None else cache_file + ".tmp"
+                        with open(fname, "wb") as fw:
+                            for chunk in req.iter_content(chunk_size=64 * 1024):
+                                fw.write(chunk)
+                        if cache_file is not None:
+                            # move/copy into the cache atomically
+                            if to_file is not None:
+                                shutil.copyfile(to_file, cache_file + ".tmp")
+                            os.replace(cache_file + ".tmp", cache_file)
+                            if to_file is None:
+                                fname = cache_file
+                        with open(fname, "r", encoding="utf-8") as f:
+                            self._read_contents(f)
+                        if to_file is not None:
+                            self._to_pickle(to_file)
+                    else:
+                        if req.encoding is None:
+                            # dinoloket serves utf-8; setting it explicitly
+                            # avoids the charset-detection scan over the payload
+                            req.encoding = "utf-8"
+                        self._read_contents(StringIO(req.text))
             else:
-                with open(to_file, "r") as f:
-                    self._read_contents(f)
+                # the parsed attributes are pickled next to the csv-file, so
+                # cache-hits skip the csv-parsing entirely
+                if not self._read_pickle(to_file):
+                    with open(to_file, "r", encoding="utf-8") as f:
+                        self._read_contents(f)
+                    self._to_pickle(to_file)
         else:
-            with open(url_or_file, "r") as f:
-                self._read_contents(f)
+            if not self._read_pickle(url_or_file):
+                with open(url_or_file, "r", encoding="utf-8") as f:
+                    self._read_contents(f)
 
     def __repr__(self):
         # retrieve properties if they exist
@@ -372,49 +518,119 @@ class CsvFileOrUrl:
             raise (NotImplementedError(f"No download-url defined for {cls.__name__}"))
         return cls(f"{cls._download_url}/{dino_nr}", **kwargs)
 
+    @classmethod
+    def from_text(cls, text):
+        """Build an object from csv-contents that are already in memory."""
+        obj = cls.__new__(cls)
+        obj._read_contents(StringIO(text))
+        return obj
+
+    @classmethod
+    def from_url(cls, url, session=None, timeout=5):
+        """Download a csv-file and parse it with from_text.
+
+        Separating the fetch from the parse lets callers schedule downloads on
+        their own workers.
+        """
+        if session is None:
+            session = _get_session()
+        req = session.get(url, timeout=timeout)
+        if not req.ok:
+            raise (Exception((f"Retieving data from {url} failed")))
+        if req.encoding is None:
+            req.encoding = "utf-8"
+        return cls.from_text(req.text)
+
+    def _read_pickle(self, fname):
+        # restore the parsed attributes from a pickle next to the csv-file, but
+        # only when the pickle is not older than the csv-file itself
+        pkl_file = fname + ".pkl"
+        try:
+            if os.path.getmtime(pkl_file) < os.path.getmtime(fname):
+                return False
+            with open(pkl_file, "rb") as f:
+                self.__dict__.update(pickle.load(f))
+            return True
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+
+    def _to_pickle(self, fname):
+        with open(fname + ".pkl", "wb") as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+
     def _read_properties_csv_rows(self, f, merge_columns=False, **kwargs):
         # this is the new format of properties from dinoloket
         df, line = self._read_csv_part(f, header=None, index_col=0, **kwargs)
-        # remove empty columns
-        df = df.loc[:, ~df.isna().all(0)]
+        # remove trailing empty columns, without building a boolean mask over the
+        # whole frame and re-indexing
+        while df.shape[1] > 0 and df.iloc[:, -1].isna().all():
+            df = df.iloc[:, :-1]
         if merge_columns:
-            for index in df.index:
-                df.at[index, 1] = " ".join(df.loc[index, ~df.loc[index].isna()].values)
-            df = df.loc[:, :1]
+            # join the non-empty values of each row in one vectorized pass; stack
+            # drops the NaN-values, like the row-wise mask did before
+            merged = df.stack().dropna().groupby(level=0).agg(" ".join)
+            s = merged.reindex(df.index, fill_value="")
         else:
             assert df.shape[1] == 1
-        d = df.squeeze().to_dict()
+            s = df.iloc[:, 0]
+        # zip the values into a dict directly, which skips the squeeze/to_dict
+        # machinery that runs for every file; box numpy scalars to native python
+        # types, like to_dict did
+        d = {
+            k: v.item() if isinstance(v, np.generic) else v
+            for k, v in zip(s.index.tolist(), s.tolist())
+        }
         return d, line
 
     def _read_properties_csv_columns(self, f, **kwargs):
         df, line = self._read_csv_part(f, **kwargs)
         assert df.shape[0] == 1
-        d = df.squeeze().to_dict()
+        d = {
+            k: v.item() if isinstance(v, np.generic) else v
+            for k, v in zip(df.columns.tolist(), df.iloc[0].tolist())
+        }
         return d, line
 
-    def _read_csv_part(self, f, sep=",", header=0, index_col=False, **kwargs):
-        strt = f.tell()
-        if header is None:
-            nrows = 0
-        else:
-            nrows = -1  # the header does not count
+    def _read_csv_part(
+        self, f, sep=",", header=0, index_col=False, date_columns=None, **kwargs
+    ):
+        # collect the lines of this part once, until a blank line or end-of-file, so
+        # the file is read in a single pass instead of counted and then parsed again
+        lines = []
         line = f.readline()
-        while line.replace(",", "") not in ["\n", ""]:
-            nrows += 1
+        while line and line.strip("\r\n,") != "":
+            lines.append(line)
             line = f.readline()
-        eind = f.tell()
-        # go back to where we were before
-        f.seek(strt)
+        if date_columns is not None and header is not None and len(lines) > 0:
+            # let read_csv parse the date-columns that are present in the header-line,
+            # which saves a second conversion pass over the data afterwards
+            columns = [x.strip('"') for x in lines[0].rstrip("\n").split(sep)]
+            parse_dates = [x for x in date_columns if x in columns]
+            if len(parse_dates) > 0:
+                kwargs["parse_dates"] = parse_dates
+                # dinoloket uses a fixed date-format, which parses much faster
+                # than letting pandas guess the format of every value
+                kwargs["date_format"] = "%d-%m-%Y"
+        if header is not None:
+            # make sure the parser never generates columns for trailing separators
+            kwargs["usecols"] = lambda column: not column.startswith("Unnamed:")
+        # the pandas c-parser is used on purpose: the pyarrow-based readers do not
+        # support the usecols-callable, index_col and date-handling used here, and
+        # would pull in a dependency this package does not have
         df = pd.read_csv(
-            f, sep=sep, index_col=index_col, nrows=nrows, header=header, **kwargs
+            StringIO("".join(lines)),
+            sep=sep,
+            index_col=index_col,
+            header=header,
+            **kwargs,
         )
-        if header is not None:
-            df = df.loc[:, ~df.columns.str.startswith("Unnamed: ")]
-        f.seek(eind)
-
         if line != "":
-            # read empty lines gat
-            while line.replace(",", "") == "\n":
+            # skip the remaining empty lines between two sections and place the
+            # cursor at the start of the next section, whose first line is
+            # returned so callers can dispatch on it
+            new_start = f.tell()
+            line = f.readline()
+            while line and line.strip("\r\n,") == "":
                 new_start = f.tell()
                 line = f.readline()
             f.seek(new_start)
@@ -445,10 +661,7 @@ class Oppervlaktewaterstand(CsvFileOrUrl):
         ):
             return
         self.meta, line = self._read_csv_part(f)
-        self.data, line = self._read_csv_part(f)
-        for column in ["Peildatum"]:
-            if column in self.data.columns:
-                self.data[column] = pd.to_datetime(self.data[column], dayfirst=True)
+        self.data, line = self._read_csv_part(f, date_columns=["Peildatum"])
 
     def to_dict(self):
         d = {**self.props}
@@ -494,10 +707,7 @@ class Grondwaterstand(CsvFileOrUrl):
         ):
             return
         self.meta, line = self._read_csv_part(f)
-        self.data, line = self._read_csv_part(f)
-        for column in ["Peildatum"]:
-            if column in self.data.columns:
-                self.data[column] = pd.to_datetime(self.data[column], dayfirst=True)
+        self.data, line = self._read_csv_part(f, date_columns=["Peildatum"])
 
     def to_dict(self):
         d = {**self.props, **self.props2}
@@ -529,12 +739,9 @@ class Grondwatersamenstelling(CsvFileOrUrl):
         # KWALITEIT gegevens VLOEIBAAR
         if line.startswith('"KWALITEIT gegevens VLOEIBAAR"'):
             line = f.readline()
-            self.kwaliteit_gegevens_vloeibaar, line = self._read_csv_part(f)
-            for column in ["Monster datum", "Analyse datum"]:
-                if column in self.kwaliteit_gegevens_vloeibaar.columns:
-                    self.kwaliteit_gegevens_vloeibaar[column] = pd.to_datetime(
-                        self.kwaliteit_gegevens_vloeibaar[column], dayfirst=True
-                    )
+            self.kwaliteit_gegevens_vloeibaar, line = self._read_csv_part(
+                f, date_columns=["Monster datum", "Analyse datum"]
+            )
 
     def to_dict(self):
         d = {**self.locatie_gegevens}
@@ -654,12 +861,9 @@ class ChemischeAnalyse(CsvFileOrUrl):
         # KWALITEIT gegevens VLOEIBAAR
         if line.startswith('"KWALITEIT gegevens VAST"'):
             line = f.readline()
-            self.kwaliteit_gegevens_vast, line = self._read_csv_part(f)
-            for column in ["Monster datum", "Analyse datum"]:
-                if column in self.kwaliteit_gegevens_vast.columns:
-                    self.kwaliteit_gegevens_vast[column] = pd.to_datetime(
-                        self.kwaliteit_gegevens_vast[column], dayfirst=True
-                    )
+            self.kwaliteit_gegevens_vast, line = self._read_csv_part(
+                f, date_columns=["Monster datum", "Analyse datum"]
+            )
 
     def to_dict(self):
         d = {**self.locatie_gegevens}
@@ -726,20 +930,38 @@ class VerticaalElektrischSondeeronderzoek(CsvFileOrUrl):
         if len(self.interpretaties) > 0:
             # only take the first interpretation, as the data will not fit in a DataFrame
             d["interpretaties"] = self.interpretaties[0]
-        if (
-            "Richting" in d
-            and "Maximale elektrode afstand L2" in d
-            and "X-coordinaat" in d
-            and "Y-coordinaat" in d
-        ):
-            angle = (d["Richting"] - 90) * np.pi / 180
-            x = d["X-coordinaat"]
-            y = d["Y-coordinaat"]
-            dx = -np.cos(angle) * d["Maximale elektrode afstand L2"]
-            dy = np.sin(angle) * d["Maximale elektrode afstand L2"]
-            d["geometry"] = LineString([(x + dx, y + dy), (x - dx, y - dy)])
         return d
 
+    @staticmethod
+    def _build_geometry(df):
+        # build the LineStrings of all records in one vectorized pass, instead of
+        # calling the shapely-constructor and the trigonometry per record
+        columns = [
+            "Richting",
+            "Maximale elektrode afstand L2",
+            "X-coordinaat",
+            "Y-coordinaat",
+        ]
+        if not np.all([column in df.columns for column in columns]):
+            return None
+        values = df[columns].to_numpy(float)
+        # records that miss one of the columns get NaN from from_records; leave
+        # their geometry missing, like the per-record key-check did before
+        valid = ~np.isnan(values).any(axis=1)
+        angle = np.deg2rad(values[valid, 0] - 90)
+        length = values[valid, 1]
+        x = values[valid, 2]
+        y = values[valid, 3]
+        dx = -np.cos(angle) * length
+        dy = np.sin(angle) * length
+        coords = np.stack(
+            [np.column_stack((x + dx, y + dy)), np.column_stack((x - dx, y - dy))],
+            axis=1,
+        )
+        geoms = np.full(len(df), None, dtype=object)
+        geoms[valid] = shapely.linestrings(coords)
+        return geoms
+
     def plot_interpretaties(
         self, nr=None, ax=None, top=0, bot=None, negative_depth=True, **kwargs
     ):
@@ -1,17 +1,30 @@
 import logging
 from functools import partial
+from itertools import chain
 
 import pandas as pd
-import requests
 
 from . import bro
+from .util import _get_session
 
 logger = logging.getLogger(__name__)
 
+_ns_garcommon = "http://www.broservices.nl/xsd/garcommon/1.0"
+# fully qualified tags, so find() does not resolve the prefix on every call
+_tag_monitoring_tube = f"{{{_ns_garcommon}}}GroundwaterMonitoringTube"
+_tag_bro_id = f"{{{_ns_garcommon}}}broId"
+_tag_tube_number = f"{{{_ns_garcommon}}}tubeNumber"
+
 
 class GroundwaterAnalysisReport(bro.FileOrUrl):
     _rest_url = "https://publiek.broservices.nl/gm/gar/v1"
     _xmlns = "http://www.broservices.nl/xsd/dsgar/1.0"
+    _ns = {
+        **bro._NS_BROCOM,
+        **bro._NS_GML,
+        "garcommon": _ns_garcommon,
+        "xmlns": _xmlns,
+    }
 
     def _read_csv(self, csvfile, **kwargs):
         df = pd.read_csv(csvfile, **kwargs)
@@ -31,36 +44,31 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
             setattr(self, k, v)
 
     def _read_contents(self, tree):
-        ns = {
-            "brocom": "http://www.broservices.nl/xsd/brocommon/3.0",
-            "gml": "http://www.opengis.net/gml/3.2",
-            "garcommon": "http://www.broservices.nl/xsd/garcommon/1.0",
-            "xmlns": self._xmlns,
-        }
+        ns = self._ns
         gars = tree.findall(".//xmlns:GAR_O", ns)
         if len(gars) != 1:
             raise (Exception("Only one GAR_O supported"))
         gar = gars[0]
-        for key in gar.attrib:
-            setattr(self, key.split("}", 1)[1], gar.attrib[key])
+        for key, value in gar.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in gar:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if len(child) == 0:
                 setattr(self, key, child.text)
             elif key == "registrationHistory":
                 self._read_children_of_children(child)
             elif key == "groundwaterMonitoringNet":
                 for grandchild in child:
-                    key2 = grandchild.tag.split("}", 1)[1]
+                    key2 = bro._tag_name(grandchild.tag)
                     if key2 == "GroundwaterMonitoringNet":
                         setattr(self, key, grandchild[0].text)
                     else:
                         logger.warning(f"Unknown key: {key2}")
             elif key == "monitoringPoint":
-                well = child.find("garcommon:GroundwaterMonitoringTube", ns)
-                gmw_id = well.find("garcommon:broId", ns).text
+                well = child.find(_tag_monitoring_tube)
+                gmw_id = well.find(_tag_bro_id).text
                 setattr(self, "groundwaterMonitoringWell", gmw_id)
-                tube_nr = int(well.find("garcommon:tubeNumber", ns).text)
+                tube_nr = int(well.find(_tag_tube_number).text)
                 setattr(self, "tubeNumber", tube_nr)
             elif key == "fieldResearch":
                 if not hasattr(self, key):
@@ -69,26 +77,31 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
             elif key == "laboratoryAnalysis":
                 if not hasattr(self, key):
                     self.laboratoryAnalysis = []
-                self.laboratoryAnalysis.append(self._read_laboratory_analysis(child))
+                self.laboratoryAnalysis.append(child)
             else:
                 logger.warning(f"Unknown key: {key}")
         if hasattr(self, "fieldResearch"):
             self.fieldResearch = pd.concat(self.fieldResearch)
         if hasattr(self, "laboratoryAnalysis"):
-            self.laboratoryAnalysis = pd.concat(self.laboratoryAnalysis)
+            # the nodes were only collected in the loop; read all analyses into
+            # one DataFrame at once, instead of building and concatenating a
+            # DataFrame per laboratoryAnalysis-node
+            self.laboratoryAnalysis = self._read_laboratory_analysis(
+                self.laboratoryAnalysis
+            )
 
     def _read_field_research(self, node):
         field_research = []
 
         d = {}
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if key == "samplingDateTime":
                 d[key] = pd.to_datetime(child.text)
             elif key in ["samplingStandard", "valuationMethod"]:
                 d[key] = child.text
             elif key in ["samplingDevice"]:
-                d[key] = f"{child[0].tag.split('}', 1)[1]}: {child[0].text}"
+                d[key] = f"{bro._tag_name(child[0].tag)}: {child[0].text}"
             elif key in ["fieldObservation"]:
                 d2 = {}
                 self._read_children_of_children(child, d2)
@@ -96,7 +109,7 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
             elif key in ["fieldMeasurement"]:
                 d2 = d.copy()
                 for greatgrandchild in child:
-                    key2 = greatgrandchild.tag.split("}", 1)[1]
+                    key2 = bro._tag_name(greatgrandchild.tag)
                     if key2 in ["parameter", "qualityControlStatus"]:
                         d2[key2] = greatgrandchild.text
                     elif key2 in ["fieldMeasurementValue"]:
@@ -109,12 +122,16 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
         df = pd.DataFrame(field_research)
         return df
 
-    def _read_laboratory_analysis(self, node):
-        laboratory_analysis = []
-        for child in node:
+    def _read_laboratory_analysis(self, nodes):
+        # collect one list per column instead of a dict per analysis, so the
+        # DataFrame constructor receives columnar data and does not have to
+        # hash every key for every row
+        columns = {}
+        count = 0
+        for child in chain.from_iterable(nodes):
             d = {}
             for grandchild in child:
-                key = grandchild.tag.split("}", 1)[1]
+                key = bro._tag_name(grandchild.tag)
                 if key == "analysisDate":
                     d[key] = self._read_date(grandchild)
                 elif key in ["analyticalTechnique", "valuationMethod"]:
@@ -122,7 +139,7 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
                 elif key == "analysis":
                     d2 = d.copy()
                     for greatgrandchild in grandchild:
-                        key2 = greatgrandchild.tag.split("}", 1)[1]
+                        key2 = bro._tag_name(greatgrandchild.tag)
                         if key2 in ["parameter", "qualityControlStatus", "limitSymbol"]:
                             d2[key2] = greatgrandchild.text
                         elif key2 in ["analysisMeasurementValue", "reportingLimit"]:
@@ -130,9 +147,13 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
                             d2["uom"] = greatgrandchild.attrib["uom"]
                         else:
                             logger.warning(f"Unknown key: {key2}")
-                    laboratory_analysis.append(d2)
-            # laboratory_analysis.append(d)
-        df = pd.DataFrame(laboratory_analysis)
+                    for key2, value in d2.items():
+                        columns.setdefault(key2, [None] * count).append(value)
+                    count += 1
+                    for column in columns.values():
+                        if len(column) < count:
+                            column.append(None)
+        df = pd.DataFrame(columns)
         if "analysisDate" in df.columns:
             df = df.set_index("analysisDate")
         return df
@@ -141,7 +162,7 @@ class GroundwaterAnalysisReport(bro.FileOrUrl):
 def get_parameter_list(url=None, timeout=5, to_file=None, **kwargs):
     if url is None:
         url = "https://publiek.broservices.nl/bro/refcodes/v1/attribute_values?domain=urn:bro:gar:ParameterList&version=latest"
-    r = requests.get(url, timeout=timeout, **kwargs)
+    r = _get_session().get(url, timeout=timeout, **kwargs)
     if not r.ok:
         raise (Exception((f"Retieving data from {url} failed")))
     if to_file is not None:
@@ -153,7 +174,9 @@ def get_parameter_list(url=None, timeout=5, to_file=None, **kwargs):
             d[prop["name"]] = prop["value"]
         d.pop("refAttributeValues")
 
-    df = pd.json_normalize(data).set_index("code")
+    # the refAttributeValues are already flattened above, so the records can be
+    # turned into a DataFrame directly, without json_normalize's schema discovery
+    df = pd.DataFrame.from_records(data).set_index("code")
     return df
 
 
@@ -1,15 +1,45 @@
 import logging
-from functools import partial
-from io import StringIO
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
 
 import numpy as np
 import pandas as pd
-import requests
+from tqdm import tqdm
 
 from . import bro
+from .util import _get_session
 
 logger = logging.getLogger(__name__)
 
+_ns_gld = "http://www.broservices.nl/xsd/dsgld/1.0"
+_ns_gldcommon = "http://www.broservices.nl/xsd/gldcommon/1.0"
+_ns_waterml = "http://www.opengis.net/waterml/2.0"
+_ns_swe = "http://www.opengis.net/swe/2.0"
+_ns_om = "http://www.opengis.net/om/2.0"
+_ns_xlink = "http://www.w3.org/1999/xlink"
+_ns = {
+    "ns11": _ns_gld,
+    "gldcommon": _ns_gldcommon,
+    "waterml": _ns_waterml,
+    "swe": _ns_swe,
+    "om": _ns_om,
+    "xlink": _ns_xlink,
+}
+# fully qualified tags for the measurement loop, so find() does not resolve
+# the prefix on every call
+_tag_measurement_tvp = f"{{{_ns_waterml}}}MeasurementTVP"
+_tag_time = f"{{{_ns_waterml}}}time"
+_tag_value = f"{{{_ns_waterml}}}value"
+_tag_metadata = f"{{{_ns_waterml}}}metadata"
+_tag_tvp_measurement_metadata = f"{{{_ns_waterml}}}TVPMeasurementMetadata"
+_tag_qualifier = f"{{{_ns_waterml}}}qualifier"
+_tag_category = f"{{{_ns_swe}}}Category"
+_tag_swe_value = f"{{{_ns_swe}}}value"
+
+# offset of dutch winter time relative to utc
+_one_hour = np.timedelta64(1, "h")
+
 
 def get_objects_as_csv(
     bro_id,
@@ -76,24 +106,70 @@ def get_objects_as_csv(
     }
     if observatietype is not None:
         params["observatietype"] = observatietype
-    req = requests.get(url, params=params)
+    req = _get_session().get(url, params=params, stream=True)
     if req.status_code > 200:
         logger.error(req.json()["errors"][0]["message"])
         return
+    # let reads from req.raw return decompressed bytes
+    req.raw.decode_content = True
     if to_file is not None:
-        with open(to_file, "w") as f:
-            f.write(req.text)
+        with open(to_file, "wb") as f:
+            shutil.copyfileobj(req.raw, f)
     if rapportagetype not in ["compact", "compact_met_timestamps"]:
         raise (Exception(f"rapportagetype {rapportagetype} is not supported for now"))
     if observatietype is None:
         raise (Exception("observatietype is None is not supported."))
-    if req.text == "":
-        return None
-    else:
+    try:
+        # parse the response stream (or the file it was saved to) directly,
+        # without materializing the decoded text first
         df = read_gld_csv(
-            StringIO(req.text), bro_id, rapportagetype=rapportagetype, **kwargs
+            to_file if to_file is not None else req.raw,
+            bro_id,
+            rapportagetype=rapportagetype,
+            **kwargs,
         )
-        return df
+    except pd.errors.EmptyDataError:
+        return None
+    return df
+
+
+def get_objects_as_csv_bulk(bro_ids, max_workers=16, silent=False, **kwargs):
+    """
+    Fetch the observations of multiple Groundwater Level Dossiers in parallel.
+
+    The downloads share the pooled session and run on a thread-pool, so the
+    wall time no longer grows with one network round-trip per dossier.
+
+    Parameters
+    ----------
+    bro_ids : iterable of str
+        The BRO-IDs of the Groundwater Level Dossiers to fetch.
+    max_workers : int, optional
+        The number of parallel downloads. The default is 16.
+    silent : bool, optional
+        Do not show a progress bar when True. The default is False.
+    **kwargs : additional keyword arguments
+        Additional arguments passed to `get_objects_as_csv`.
+
+    Returns
+    -------
+    dict
+        A dictionary with the BRO-IDs as keys and the DataFrames returned by
+        `get_objects_as_csv` as values, in the order of `bro_ids`.
+    """
+    bro_ids = list(bro_ids)
+    data = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(get_objects_as_csv, bro_id, **kwargs): bro_id
+            for bro_id in bro_ids
+        }
+        for future in tqdm(
+            as_completed(futures), total=len(futures), disable=silent, mininterval=0.5
+        ):
+            data[futures[future]] = future.result()
+    # keep the order of the requested bro_ids
+    return {bro_id: data[bro_id] for bro_id in bro_ids}
 
 
 def get_series_as_csv(
@@ -137,17 +213,22 @@ def get_series_as_csv(
         params["filterOnStatusQualityControl"] = filter_on_status_quality_control
     if asISO8601:
         params["asISO8601"] = ""
-    req = requests.get(url, params=params)
+    req = _get_session().get(url, params=params, stream=True)
     if req.status_code > 200:
         logger.error(req.json()["errors"][0]["message"])
         return
+    # let reads from req.raw return decompressed bytes
+    req.raw.decode_content = True
     if to_file is not None:
-        with open(to_file, "w") as f:
-            f.write(req.text)
-    if req.text == "":
+        with open(to_file, "wb") as f:
+            shutil.copyfileobj(req.raw, f)
+    try:
+        # parse the response stream (or the file it was saved to) directly,
+        # without materializing the decoded text first
+        df = pd.read_csv(to_file if to_file is not None else req.raw)
+    except pd.errors.EmptyDataError:
         return None
     else:
-        df = pd.read_csv(StringIO(req.text))
         if "Tijdstip" in df.columns:
             if asISO8601:
                 df["Tijdstip"] = pd.to_datetime(df["Tijdstip"])
@@ -206,16 +287,21 @@ def read_gld_csv(fname, bro_id, rapportagetype, **kwargs):
         "censoring_limitvalue",
         "interpolation_type",
     ]
+    # constrain the dtypes that matter, so pandas does not have to infer them
+    # and to_datetime below receives int64 epochs, its fast path
+    dtype = {"value": "float64"}
     if rapportagetype == "compact":
         parse_dates = ["time"]
     else:
         parse_dates = None
+        dtype["time"] = "int64"
     df = pd.read_csv(
         fname,
         names=names,
         index_col="time",
         parse_dates=parse_dates,
         usecols=[0, 1, 2],
+        dtype=dtype,
     )
     if rapportagetype == "compact_met_timestamps":
         df.index = pd.to_datetime(df.index, unit="ms")
@@ -227,7 +313,7 @@ def read_gld_csv(fname, bro_id, rapportagetype, **kwargs):
     return df
 
 
-def get_observations_summary(bro_id):
+def get_observations_summary(bro_id, as_dataframe=True):
     """
     Fetch a summary of a Groundwater Level Dossier (GLD) in JSON format based on
     the provided BRO-ID. The summary includes details about the groundwater level
@@ -237,6 +323,10 @@ def get_observations_summary(bro_id):
     ----------
     bro_id : str
         The BRO-ID of the Groundwater Level Dossier to fetch the summary for.
+    as_dataframe : bool, optional
+        If False, return the summary as a list of dictionaries instead of a
+        DataFrame, which is faster for the typically small summaries. Default
+        is True.
 
     Raises
     ------
@@ -246,10 +336,12 @@ def get_observations_summary(bro_id):
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame or list of dict
         A DataFrame containing the summary of the groundwater level observations.
         The DataFrame will be indexed by the `observationId` and include
         `startDate` and `endDate` columns, converted to `datetime` format.
+        When `as_dataframe` is False, a list with a dictionary per observation
+        is returned instead, with the dates converted in the same way.
 
     Notes
     -----
@@ -258,12 +350,17 @@ def get_observations_summary(bro_id):
     `endDate` fields, they will be converted to `datetime` format using the
     `pd.to_datetime` function.
     """
-    url = GroundwaterLevelDossier._rest_url
-    url = "{}/objects/{}/observationsSummary".format(url, bro_id)
-    req = requests.get(url)
-    if req.status_code > 200:
-        raise (Exception(req.json()["errors"][0]["message"]))
-    df = pd.DataFrame(req.json())
+    data = _get_observations_summary_json(bro_id)
+    if not as_dataframe:
+        # skip the DataFrame machinery, which dominates for these small
+        # summaries; copy the dicts so the cached json stays untouched
+        data = [d.copy() for d in data]
+        for d in data:
+            for key in ("startDate", "endDate"):
+                if key in d:
+                    d[key] = pd.to_datetime(d[key], dayfirst=True)
+        return data
+    df = pd.DataFrame(data)
     if "observationId" in df.columns:
         df = df.set_index("observationId")
     if "startDate" in df.columns:
@@ -273,6 +370,19 @@ def get_observations_summary(bro_id):
     return df
 
 
+@lru_cache(maxsize=None)
+def _get_observations_summary_json(bro_id):
+    # the summary of a dossier is stable, so cache the json response per
+    # bro_id; the DataFrame is rebuilt on every call, so callers can alter it
+    # without affecting the cache
+    url = GroundwaterLevelDossier._rest_url
+    url = "{}/objects/{}/observationsSummary".format(url, bro_id)
+    req = _get_session().get(url)
+    if req.status_code > 200:
+        raise (Exception(req.json()["errors"][0]["message"]))
+    return req.json()
+
+
 class GroundwaterLevelDossier(bro.FileOrUrl):
     """
     Represents a Groundwater Level Dossier (GLD) containing groundwater monitoring
@@ -335,20 +445,13 @@ class GroundwaterLevelDossier(bro.FileOrUrl):
         The observation data is stored in the `observation` attribute and can be
         accessed as a DataFrame.
         """
-        ns = {
-            "ns11": "http://www.broservices.nl/xsd/dsgld/1.0",
-            "gldcommon": "http://www.broservices.nl/xsd/gldcommon/1.0",
-            "waterml": "http://www.opengis.net/waterml/2.0",
-            "swe": "http://www.opengis.net/swe/2.0",
-            "om": "http://www.opengis.net/om/2.0",
-            "xlink": "http://www.w3.org/1999/xlink",
-        }
+        ns = _ns
         glds = tree.findall(".//ns11:GLD_O", ns)
         if len(glds) != 1:
             raise (Exception("Only one gld supported"))
         gld = glds[0]
-        for key in gld.attrib:
-            setattr(self, key.split("}", 1)[1], gld.attrib[key])
+        for key, value in gld.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in gld:
             key = child.tag.split("}", 1)[1]
             if len(child) == 0:
@@ -403,24 +506,24 @@ class GroundwaterLevelDossier(bro.FileOrUrl):
                 ):
                     continue
 
-                times = []
-                values = []
-                qualifiers = []
-                for measurement in child.findall(".//waterml:MeasurementTVP", ns):
-                    times.append(measurement.find("waterml:time", ns).text)
-                    value = measurement.find("waterml:value", ns).text
-                    if value is None:
-                        values.append(np.nan)
-                    else:
-                        values.append(float(value))
-                    metadata = measurement.find("waterml:metadata", ns)
-                    TVPMM = metadata.find("waterml:TVPMeasurementMetadata", ns)
-                    qualifier = TVPMM.find("waterml:qualifier", ns)
-                    value = qualifier.find("swe:Category", ns).find("swe:value", ns)
-                    qualifiers.append(value.text)
+                measurements = list(child.iter(_tag_measurement_tvp))
+                # fill preallocated arrays instead of appending to python
+                # lists, so pandas can take the arrays as they are
+                times = np.empty(len(measurements), dtype=object)
+                values = np.empty(len(measurements), dtype=np.float64)
+                qualifiers = np.empty(len(measurements), dtype=object)
+                for i, measurement in enumerate(measurements):
+                    times[i] = measurement.find(_tag_time).text
+                    value = measurement.find(_tag_value).text
+                    values[i] = np.nan if value is None else float(value)
+                    metadata = measurement.find(_tag_metadata)
+                    TVPMM = metadata.find(_tag_tvp_measurement_metadata)
+                    qualifier = TVPMM.find(_tag_qualifier)
+                    value = qualifier.find(_tag_category).find(_tag_swe_value)
+                    qualifiers[i] = value.text
                 observation = pd.DataFrame(
                     {
-                        "time": pd.to_datetime(times, utc=True),
+                        "time": pd.to_datetime(times, utc=True, format="ISO8601"),
                         "value": values,
                         "qualifier": qualifiers,
                         "status": status_value,
@@ -433,7 +536,11 @@ class GroundwaterLevelDossier(bro.FileOrUrl):
             else:
                 logger.warning(f"Unknown key: {key}")
         if hasattr(self, "observation"):
-            self.observation = pd.concat(self.observation)
+            if len(self.observation) == 1:
+                # skip the copy pd.concat makes of a single frame
+                self.observation = self.observation[0]
+            else:
+                self.observation = pd.concat(self.observation)
             self.observation = process_observations(
                 self.observation, self.broId, **kwargs
             )
@@ -491,9 +598,13 @@ def process_observations(
     will convert it to Dutch winter time (CET/CEST).
     """
     if to_wintertime:
-        # remove time zone information by transforming to dutch winter time
-        one_hour = pd.Timedelta(1, unit="h")
-        df.index = pd.to_datetime(df.index, utc=True).tz_localize(None) + one_hour
+        # remove time zone information by transforming to dutch winter time;
+        # the values of a tz-aware index are the naive utc timestamps, so
+        # adding one hour to them does both steps in a single vectorized pass
+        idx = df.index
+        if not isinstance(idx, pd.DatetimeIndex):
+            idx = pd.to_datetime(idx, utc=True)
+        df.index = pd.DatetimeIndex(idx.values + _one_hour, name=idx.name)
 
     if qualifier is not None:
         if isinstance(qualifier, str):
@@ -501,15 +612,27 @@ def process_observations(
         else:
             df = df[df["qualifier"].isin(qualifier)]
 
-    if df.index.has_duplicates and drop_duplicates:
-        duplicates = df.index.duplicated(keep="first")
-        message = "{} contains {} duplicates (of {}). Keeping only first values."
-        logger.warning(message.format(bro_id, duplicates.sum(), len(df.index)))
-        df = df[~duplicates]
-
-    if sort:
-        # sort DataFrame
-        df = df.sort_index()
+    if sort and not df.index.is_monotonic_increasing:
+        # sort DataFrame, with a stable sort so "first" below still refers to
+        # the original file order; in practice the index is usually already
+        # sorted, and is_monotonic_increasing exits early when it is not
+        df = df.sort_index(kind="stable")
+
+    if drop_duplicates and len(df.index) > 0:
+        if sort:
+            # on a sorted index duplicates are adjacent, so they can be found
+            # by comparing neighbours, without building a hash table
+            i8 = df.index.values.view("i8")
+            keep = np.empty(len(i8), dtype=bool)
+            keep[0] = True
+            np.not_equal(i8[1:], i8[:-1], out=keep[1:])
+            duplicates = ~keep
+        else:
+            duplicates = df.index.duplicated(keep="first")
+        if duplicates.any():
+            message = "{} contains {} duplicates (of {}). Keeping only first values."
+            logger.warning(message.format(bro_id, duplicates.sum(), len(df.index)))
+            df = df[~duplicates]
     return df
 
 
@@ -11,27 +11,28 @@ logger = logging.getLogger(__name__)
 class GroundwaterMonitoringNetwork(bro.FileOrUrl):
     _rest_url = "https://publiek.broservices.nl/gm/gmn/v1"
     _xmlns = "http://www.broservices.nl/xsd/dsgmn/1.0"
+    _ns = {
+        **bro._NS_BROCOM,
+        **bro._NS_GML,
+        "gmncom": "http://www.broservices.nl/xsd/gmncommon/1.0",
+        "xmlns": _xmlns,
+    }
 
     def _read_contents(self, tree):
-        ns = {
-            "brocom": "http://www.broservices.nl/xsd/brocommon/3.0",
-            "gml": "http://www.opengis.net/gml/3.2",
-            "gmncom": "http://www.broservices.nl/xsd/gmncommon/1.0",
-            "xmlns": self._xmlns,
-        }
+        ns = self._ns
         gmns = tree.findall(".//xmlns:GMN_PO", ns)
         if len(gmns) != 1:
             raise (Exception("Only one GMN_PO supported"))
         gmn = gmns[0]
-        for key in gmn.attrib:
-            setattr(self, key.split("}", 1)[1], gmn.attrib[key])
+        for key, value in gmn.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in gmn:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if len(child) == 0:
                 setattr(self, key, child.text)
             elif key == "monitoringNetHistory":
                 for grandchild in child:
-                    key = grandchild.tag.split("}", 1)[1]
+                    key = bro._tag_name(grandchild.tag)
                     if key == "startDateMonitoring":
                         setattr(self, key, self._read_date(grandchild))
                     else:
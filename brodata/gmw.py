@@ -1,13 +1,11 @@
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import partial
 from zipfile import ZipFile
 
-import geopandas as gpd
-import numpy as np
 import pandas as pd
-import requests
 from tqdm import tqdm
 
 from . import bro, gar, gld
@@ -15,7 +13,7 @@ from .frd import FormationResistanceDossier
 from .gar import GroundwaterAnalysisReport
 from .gld import GroundwaterLevelDossier
 from .gmn import GroundwaterMonitoringNetwork
-from .util import _save_data_to_zip
+from .util import _get_session, _save_data_to_zip
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +38,7 @@ def get_well_code(bro_id):
     """
 
     url = f"{GroundwaterMonitoringWell._rest_url}/well-code/{bro_id}"
-    req = requests.get(url)
+    req = _get_session().get(url)
     if req.status_code > 200:
         logger.error(req.reason)
         return
@@ -84,12 +82,13 @@ class GroundwaterMonitoringWell(bro.FileOrUrl):
     _rest_url = "https://publiek.broservices.nl/gm/gmw/v1"
     _xmlns = "http://www.broservices.nl/xsd/dsgmw/1.1"
     _char = "GMW_C"
+    _ns = {
+        **bro._NS_BROCOM,
+        "xmlns": _xmlns,
+    }
 
     def _read_contents(self, tree):
-        ns = {
-            "brocom": "http://www.broservices.nl/xsd/brocommon/3.0",
-            "xmlns": self._xmlns,
-        }
+        ns = self._ns
 
         gmws = tree.findall(".//xmlns:GMW_PO", ns)
         if len(gmws) == 0:
@@ -100,10 +99,10 @@ class GroundwaterMonitoringWell(bro.FileOrUrl):
             raise (Exception("Only one gmw supported"))
         gmw = gmws[0]
 
-        for key in gmw.attrib:
-            setattr(self, key.split("}", 1)[1], gmw.attrib[key])
+        for key, value in gmw.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in gmw:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if len(child) == 0:
                 setattr(self, key, child.text)
             elif key == "standardizedLocation":
@@ -112,7 +111,7 @@ class GroundwaterMonitoringWell(bro.FileOrUrl):
                 self._read_delivered_location(child)
             elif key == "wellHistory":
                 for grandchild in child:
-                    key = grandchild.tag.split("}", 1)[1]
+                    key = bro._tag_name(grandchild.tag)
                     if key == "wellConstructionDate":
                         setattr(self, key, self._read_date(grandchild))
                     elif key == "intermediateEvent":
@@ -125,7 +124,7 @@ class GroundwaterMonitoringWell(bro.FileOrUrl):
 
             elif key in ["deliveredVerticalPosition", "registrationHistory"]:
                 for grandchild in child:
-                    key = grandchild.tag.split("}", 1)[1]
+                    key = bro._tag_name(grandchild.tag)
                     setattr(self, key, grandchild.text)
             elif key in ["monitoringTube"]:
                 if not hasattr(self, key):
@@ -136,17 +135,18 @@ class GroundwaterMonitoringWell(bro.FileOrUrl):
             else:
                 logger.warning(f"Unknown key: {key}")
         if hasattr(self, "monitoringTube"):
-            self.monitoringTube = pd.DataFrame(self.monitoringTube)
-            tubeNumber = self.monitoringTube["tubeNumber"].astype(int)
-            self.monitoringTube["tubeNumber"] = tubeNumber
-            self.monitoringTube = self.monitoringTube.set_index("tubeNumber")
+            # from_records handles the list of tube-dicts in one pass
+            df = pd.DataFrame.from_records(self.monitoringTube)
+            df["tubeNumber"] = df["tubeNumber"].astype(int)
+            df.set_index("tubeNumber", inplace=True)
+            self.monitoringTube = df
         if hasattr(self, "intermediateEvent"):
             self.intermediateEvent = pd.DataFrame(self.intermediateEvent)
 
     def _read_intermediate_event(self, node):
         d = {}
         for child in node:
-            key = child.tag.split("}", 1)[1]
+            key = bro._tag_name(child.tag)
             if key == "eventName":
                 d[key] = child.text
             elif key == "eventDate":
@@ -170,6 +170,7 @@ def get_observations(
     to_zip=None,
     redownload=False,
     zipfile=None,
+    max_workers=16,
     _files=None,
 ):
     """
@@ -217,6 +218,9 @@ def get_observations(
     zipfile : zipfile.ZipFile, optional
         A zipfile-object. When not None, zipfile is used to read previously downloaded
         data from. The default is None.
+    max_workers : int, optional
+        The number of threads used to download the relations and observations
+        in parallel. The default is 16.
 
 
     Returns
@@ -269,7 +273,13 @@ def get_observations(
     to_file = None
     if to_path is not None and not os.path.isdir(to_path):
         os.makedirs(to_path)
-    for bro_id in tqdm(np.unique(bro_ids), disable=silent, desc=desc):
+    # first collect the gmw-relations of every well, downloading the missing
+    # ones in parallel; dict.fromkeys deduplicates without sorting, keeping
+    # the order the wells were supplied in
+    unique_ids = list(dict.fromkeys(bro_ids))
+    relations = {}
+    fetch_ids = []
+    for bro_id in unique_ids:
         to_rel_file = None
         if zipfile is not None or to_path is not None:
             to_rel_file = f"gmw_relations_{bro_id}.json"
@@ -280,22 +290,34 @@ def get_observations(
         if zipfile is None and (
             redownload or to_rel_file is None or not os.path.isfile(to_rel_file)
         ):
-            url = f"https://publiek.broservices.nl/gm/v1/gmw-relations/{bro_id}"
-            req = requests.get(url)
-            if req.status_code > 200:
-                logger.error(req.json()["errors"][0]["message"])
-                return
-            if to_rel_file is not None:
-                with open(to_rel_file, "w") as f:
-                    f.write(req.text)
-            data = req.json()
+            fetch_ids.append((bro_id, to_rel_file))
         else:
             if zipfile is not None:
                 with zipfile.open(to_rel_file) as f:
-                    data = json.load(f)
+                    relations[bro_id] = json.load(f)
             else:
                 with open(to_rel_file) as f:
-                    data = json.load(f)
+                    relations[bro_id] = json.load(f)
+    if len(fetch_ids) > 0:
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {
+                executor.submit(_get_gmw_relations, bro_id, to_rel_file): bro_id
+                for bro_id, to_rel_file in fetch_ids
+            }
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                disable=silent,
+                desc="Downloading gmw-relations",
+            ):
+                relations[futures[future]] = future.result()
+        if any(relations[bro_id] is None for bro_id, _ in fetch_ids):
+            return
+
+    # then collect one task per reference, in a deterministic order
+    tasks = []
+    for bro_id in unique_ids:
+        data = relations[bro_id]
         for tube_ref in data["monitoringTubeReferences"]:
             tube_ref["groundwaterMonitoringWell"] = data["gmwBroId"]
             if tube_number is not None:
@@ -312,75 +334,115 @@ def get_observations(
                         to_file = os.path.join(to_path, to_file)
                     if _files is not None:
                         _files.append(to_file)
-                if zipfile is None and (
+                download = zipfile is None and (
                     redownload or to_file is None or not os.path.isfile(to_file)
-                ):
-                    if kind == "gld":
-                        if as_csv:
-                            df = gld.get_objects_as_csv(
-                                ref["broId"], qualifier=qualifier, to_file=to_file
-                            )
-                        else:
-                            df = GroundwaterLevelDossier.from_bro_id(
-                                ref["broId"], qualifier=qualifier, to_file=to_file
-                            )
-                    elif kind == "gar":
-                        df = GroundwaterAnalysisReport.from_bro_id(
-                            ref["broId"], to_file=to_file
-                        )
-                    elif kind == "frd":
-                        df = FormationResistanceDossier.from_bro_id(
-                            ref["broId"], to_file=to_file
-                        )
-                    elif kind == "gmn":
-                        df = GroundwaterMonitoringNetwork.from_bro_id(
-                            ref["broId"], to_file=to_file
-                        )
-                else:
-                    if kind == "gld":
-                        if as_csv:
-                            if zipfile is not None:
-                                to_file = zipfile.open(to_file)
-                            df = gld.read_gld_csv(
-                                to_file,
-                                ref["broId"],
-                                rapportagetype="compact_met_timestamps",
-                                qualifier=qualifier,
-                            )
-                        else:
-                            df = GroundwaterLevelDossier(
-                                to_file, qualifier=qualifier, zipfile=zipfile
-                            )
-                    elif kind == "gar":
-                        df = GroundwaterAnalysisReport(to_file, zipfile=zipfile)
-                    elif kind == "frd":
-                        df = FormationResistanceDossier(to_file, zipfile=zipfile)
-                    elif kind == "gmn":
-                        df = GroundwaterMonitoringNetwork(to_file, zipfile=zipfile)
-
-                if as_csv:
-                    tube_ref["observation"] = df
-                    for key in drop_references:
-                        if key in tube_ref:
-                            tube_ref.pop(key)
-                        else:
-                            logger.warning(
-                                "{} not defined for {}, filter {}".format(
-                                    key,
-                                    tube_ref["groundwaterMonitoringWell"],
-                                    tube_ref["tubeNumber"],
-                                )
-                            )
-
-                    tube_ref["broId"] = ref["broId"]
-                    tubes.append(tube_ref)
+                )
+                tasks.append((tube_ref, ref, to_file, download))
+
+    # retrieve the observations in parallel; reading from a shared zipfile is
+    # not thread-safe, so that path stays sequential
+    results = [None] * len(tasks)
+    if zipfile is not None:
+        for i, (_, ref, to_file, download) in enumerate(
+            tqdm(tasks, disable=silent, desc=desc)
+        ):
+            results[i] = _get_observation(
+                ref["broId"], to_file, download, kind, as_csv, qualifier, zipfile
+            )
+    elif len(tasks) > 0:
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _get_observation,
+                    ref["broId"],
+                    to_file,
+                    download,
+                    kind,
+                    as_csv,
+                    qualifier,
+                    zipfile,
+                ): i
+                for i, (_, ref, to_file, download) in enumerate(tasks)
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), disable=silent, desc=desc
+            ):
+                results[futures[future]] = future.result()
+
+    for (tube_ref, ref, _, _), df in zip(tasks, results):
+        if as_csv:
+            tube_ref["observation"] = df
+            for key in drop_references:
+                if key in tube_ref:
+                    tube_ref.pop(key)
                 else:
-                    tubes.append(df.to_dict())
+                    logger.warning(
+                        "{} not defined for {}, filter {}".format(
+                            key,
+                            tube_ref["groundwaterMonitoringWell"],
+                            tube_ref["tubeNumber"],
+                        )
+                    )
+
+            tube_ref["broId"] = ref["broId"]
+            tubes.append(tube_ref)
+        else:
+            tubes.append(df.to_dict())
     if to_zip is not None:
         _save_data_to_zip(to_zip, _files, remove_path_again, to_path)
     return pd.DataFrame(tubes)
 
 
+def _get_gmw_relations(bro_id, to_file=None):
+    """Download the gmw-relations of a single well, optionally saving them."""
+    url = f"https://publiek.broservices.nl/gm/v1/gmw-relations/{bro_id}"
+    req = _get_session().get(url)
+    if req.status_code > 200:
+        logger.error(req.json()["errors"][0]["message"])
+        return None
+    if to_file is not None:
+        with open(to_file, "w") as f:
+            f.write(req.text)
+    return req.json()
+
+
+def _get_observation(bro_id, to_file, download, kind, as_csv, qualifier, zipfile):
+    """Retrieve a single observation dossier, from the BRO-servers or a file."""
+    if download:
+        if kind == "gld":
+            if as_csv:
+                return gld.get_objects_as_csv(
+                    bro_id, qualifier=qualifier, to_file=to_file
+                )
+            return GroundwaterLevelDossier.from_bro_id(
+                bro_id, qualifier=qualifier, to_file=to_file
+            )
+        elif kind == "gar":
+            return GroundwaterAnalysisReport.from_bro_id(bro_id, to_file=to_file)
+        elif kind == "frd":
+            return FormationResistanceDossier.from_bro_id(bro_id, to_file=to_file)
+        elif kind == "gmn":
+            return GroundwaterMonitoringNetwork.from_bro_id(bro_id, to_file=to_file)
+    else:
+        if kind == "gld":
+            if as_csv:
+                if zipfile is not None:
+                    to_file = zipfile.open(to_file)
+                return gld.read_gld_csv(
+                    to_file,
+                    bro_id,
+                    rapportagetype="compact_met_timestamps",
+                    qualifier=qualifier,
+                )
+            return GroundwaterLevelDossier(to_file, qualifier=qualifier, zipfile=zipfile)
+        elif kind == "gar":
+            return GroundwaterAnalysisReport(to_file, zipfile=zipfile)
+        elif kind == "frd":
+            return FormationResistanceDossier(to_file, zipfile=zipfile)
+        elif kind == "gmn":
+            return GroundwaterMonitoringNetwork(to_file, zipfile=zipfile)
+
+
 def get_tube_observations(gwm_id, tube_number, kind="gld", **kwargs):
     """
     Get the observations of a single groundwater monitoring tube.
@@ -449,20 +511,30 @@ def get_tube_gdf(gmws, index=None):
         gmws = pd.DataFrame([gmws[x].to_dict() for x in gmws])
         if "broId" in gmws.columns:
             gmws = gmws.set_index("broId")
-    tubes = []
+    # combine the properties of each well with its monitoringTube-DataFrame in
+    # one go, instead of concatenating a Series per tube
+    well_columns = gmws.columns.drop("monitoringTube")
+    parts = []
     for bro_id in gmws.index:
-        for tube_number in gmws.loc[bro_id, "monitoringTube"].index:
-            # combine properties of well and tube
-            tube = pd.concat(
-                (
-                    gmws.loc[bro_id].drop("monitoringTube"),
-                    gmws.loc[bro_id, "monitoringTube"].loc[tube_number],
-                )
-            )
-            tube["groundwaterMonitoringWell"] = bro_id
-            tube["tubeNumber"] = tube_number
-
-            tubes.append(tube)
+        tube_df = gmws.loc[bro_id, "monitoringTube"]
+        part = tube_df.copy()
+        for column in well_columns:
+            # broadcast with a list, as the well properties can contain
+            # objects (dicts) that pandas would otherwise interpret
+            part[column] = [gmws.at[bro_id, column]] * len(part)
+        part["groundwaterMonitoringWell"] = bro_id
+        part["tubeNumber"] = tube_df.index
+        column_order = [
+            *well_columns,
+            *tube_df.columns,
+            "groundwaterMonitoringWell",
+            "tubeNumber",
+        ]
+        parts.append(part[column_order])
+    if len(parts) > 0:
+        tubes = pd.concat(parts, ignore_index=True)
+    else:
+        tubes = []
 
     if index is None:
         index = ["groundwaterMonitoringWell", "tubeNumber"]
@@ -644,13 +716,18 @@ def get_data_in_extent(
 
         logger.info("Combining well-properties, tube-properties and observations")
 
-        data = {}
-        ids = {}
-        for index in gdf.index:
-            if index not in obs_df.index:
-                continue
-            data[index] = _combine_observations(obs_df.loc[[index], datcol], kind=kind)
-            ids[index] = list(obs_df.loc[[index], "broId"])
+        # group the observations per tube in one pass, instead of repeated
+        # .loc-lookups per tube; assigning the dicts reindexes them on gdf
+        if obs_df.empty:
+            data = {}
+            ids = {}
+        else:
+            grouped = obs_df.groupby(level=[0, 1])
+            data = {
+                index: _combine_observations(observations, kind=kind)
+                for index, observations in grouped[datcol]
+            }
+            ids = grouped["broId"].agg(list).to_dict()
         gdf[datcol] = data
         gdf[idcol] = ids
         return gdf
@@ -687,8 +764,14 @@ def _combine_observations(observations, kind):
         obslist.append(observation)
     if len(obslist) == 0:
         return _get_empty_observation_df(kind)
+    if len(obslist) == 1:
+        # skip the copy pd.concat makes of a single frame
+        df = obslist[0]
     else:
-        return pd.concat(obslist).sort_index()
+        df = pd.concat(obslist)
+    if df.index.is_monotonic_increasing:
+        return df
+    return df.sort_index()
 
 
 def get_tube_gdf_from_characteristics(
@@ -722,21 +805,28 @@ def get_tube_gdf_from_characteristics(
         GeoDataFrame of combined well and tube properties
     """
     bids = characteristics_gdf.index.unique()
-    gmws = []
-    for bid in bids:
-        if zipfile is not None:
-            fname = f"{bid}.xml"
-            gmw = GroundwaterMonitoringWell(fname, zipfile=zipfile)
-        else:
+    if zipfile is not None:
+        # a zipfile cannot be read from multiple threads
+        gmws = [GroundwaterMonitoringWell(f"{bid}.xml", zipfile=zipfile) for bid in bids]
+    else:
+        to_files = []
+        for bid in bids:
             to_file = None
             if to_path is not None:
                 to_file = os.path.join(to_path, f"{bid}.xml")
                 if _files is not None:
                     _files.append(to_file)
-            gmw = GroundwaterMonitoringWell.from_bro_id(
-                bid, to_file=to_file, redownload=redownload
+            to_files.append(to_file)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            # executor.map downloads the wells in parallel, in order
+            gmws = list(
+                executor.map(
+                    lambda args: GroundwaterMonitoringWell.from_bro_id(
+                        args[0], to_file=args[1], redownload=redownload
+                    ),
+                    zip(bids, to_files),
+                )
             )
-        gmws.append(gmw)
     gdf = get_tube_gdf(gmws, index=index)
     return gdf
 
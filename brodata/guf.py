@@ -28,8 +28,8 @@ class GroundwaterUtilisationFacility(bro.FileOrUrl):
         if len(gufs) != 1:
             raise (Exception("Only one GUF_PO supported"))
         guf = gufs[0]
-        for key in guf.attrib:
-            setattr(self, key.split("}", 1)[1], guf.attrib[key])
+        for key, value in guf.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in guf:
             key = child.tag.split("}", 1)[1]
             if len(child) == 0:
@@ -21,8 +21,8 @@ class SoilFaceResearch(bro.FileOrUrl):
         if len(sfrs) != 1:
             raise (Exception("Only one SFR_O supported"))
         sfr = sfrs[0]
-        for key in sfr.attrib:
-            setattr(self, key.split("}", 1)[1], sfr.attrib[key])
+        for key, value in sfr.attrib.items():
+            setattr(self, bro._tag_name(key), value)
         for child in sfr:
             key = child.tag.split("}", 1)[1]
             if len(child) == 0:
@@ -1,12 +1,37 @@
 import logging
 import os
+from functools import lru_cache
 from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 
 import numpy as np
+import requests
+from urllib3.util import Retry
 
 logger = logging.getLogger(__name__)
 
 
+def _get_session(max_retries=2):
+    """Return a shared requests.Session, so connections to the servers are reused.
+
+    The session keeps the underlying TCP/TLS-connections alive, which saves a
+    handshake for every file in the download loops. Together with the
+    thread-pools around the download loops this saturates the connection pool
+    without needing an async http-client as extra dependency. One session is
+    kept per retry-count, so the max_retries arguments of the callers keep
+    working.
+    """
+    return _make_session(max_retries)
+
+
+@lru_cache(maxsize=None)
+def _make_session(max_retries):
+    retries = Retry(total=max_retries, backoff_factor=0.3)
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=32, max_retries=retries)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
+
+
 def read_zipfile(fname, pathnames=None, override_ext=None):
     with ZipFile(fname) as zf:
         namelist = np.array(zf.namelist())
@@ -103,21 +128,32 @@ def read_zipfile(fname, pathnames=None, override_ext=None):
         return data
 
 
-def _save_data_to_zip(to_zip, files, remove_path_again, to_path):
+def _open_zipfile(to_zip):
     try:
         import zlib
 
         compression = ZIP_DEFLATED
     except:
         compression = ZIP_STORED
-    with ZipFile(to_zip, "w", compression=compression) as zf:
+    return ZipFile(to_zip, "w", compression=compression)
+
+
+def _save_data_to_zip(to_zip, files, remove_path_again, to_path):
+    with _open_zipfile(to_zip) as zf:
         for file in files:
             zf.write(file, os.path.split(file)[1])
     if remove_path_again:
-        # remove individual files again
-        for file in files:
-            os.remove(file)
-        os.removedirs(to_path)
+        _remove_files_again(files, to_path)
+
+
+def _remove_files_again(files, to_path):
+    # remove individual files again
+    for file in files:
+        os.remove(file)
+        if os.path.isfile(file + ".pkl"):
+            # also remove the pickle-sidecar of a parsed csv-file
+            os.remove(file + ".pkl")
+    os.removedirs(to_path)
 
 
 def _format_repr(self, props):
@@ -1,12 +1,15 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import geopandas as gpd
 import numpy as np
-import requests
 from requests.exceptions import HTTPError
 from shapely.geometry import MultiPolygon, Point, Polygon
 from tqdm import tqdm
 
+from .util import _get_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,11 +91,11 @@ def arcrest(
         object_ids = props["properties"]["objectIds"]
         object_id_field_name = props["properties"]["objectIdFieldName"]
     if object_ids is not None and len(object_ids) > max_record_count:
-        # download in batches
+        # download in batches, with a few requests in flight at once
         object_ids.sort()
         n_d = int(np.ceil((len(object_ids) / max_record_count)))
-        features = []
-        for i_d in tqdm(range(n_d)):
+
+        def _get_batch(i_d):
             i_min = i_d * max_record_count
             i_max = min(i_min + max_record_count - 1, len(object_ids) - 1)
             where = "{}>={} and {}<={}".format(
@@ -101,9 +104,17 @@ def arcrest(
                 object_id_field_name,
                 object_ids[i_max],
             )
-            params["where"] = where
-            data = _get_data(url_query, params, timeout=timeout, **kwargs)
-            features.extend(data["features"])
+            return _get_data(
+                url_query, {**params, "where": where}, timeout=timeout, **kwargs
+            )
+
+        features = []
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # executor.map keeps the batches in order
+            for data in tqdm(
+                executor.map(_get_batch, range(n_d)), total=n_d, mininterval=0.5
+            ):
+                features.extend(data["features"])
     else:
         # download all data in one go
         data = _get_data(url_query, params, timeout=timeout, **kwargs)
@@ -172,7 +183,7 @@ def _get_data(url, params, timeout=5, **kwargs):
     data
 
     """
-    r = requests.get(url, params=params, timeout=timeout, **kwargs)
+    r = _get_session().get(url, params=params, timeout=timeout, **kwargs)
     if not r.ok:
         raise (HTTPError(f"Request not successful: {r.url}"))
     data = r.json()
@@ -221,7 +232,10 @@ services = {
 }
 
 
+@lru_cache(maxsize=None)
 def get_configuration(mapserver_url=None):
+    # the configuration does not change within a session, so only build it once
+    # per mapserver_url; use get_configuration.cache_clear() to force a rebuild
     config = {}
     if mapserver_url is None:
         mapserver_url = "https://www.broloket.nl/standalone/rest/services"
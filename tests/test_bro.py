@@ -2,6 +2,7 @@
 import os
 import tempfile
 
+import pandas as pd
 from pandas.testing import assert_frame_equal
 
 import brodata
@@ -93,6 +94,26 @@ def test_gld_get_series_as_csv():
     brodata.gld.get_series_as_csv("GLD000000012893")
 
 
+def test_gld_process_observations():
+    time = pd.to_datetime(
+        [
+            "2024-01-01 10:00:00+00:00",
+            "2024-01-01 09:00:00+00:00",
+            "2024-01-01 10:00:00+00:00",
+        ]
+    )
+    df = pd.DataFrame({"value": [1.0, 2.0, 3.0]}, index=time)
+    df = brodata.gld.process_observations(df, "GLD_test")
+    # the index is converted to dutch winter time, sorted, and the duplicate
+    # observation is dropped, keeping the first value
+    assert df.index.tz is None
+    assert df.index.is_monotonic_increasing
+    assert df.index.tolist() == pd.to_datetime(
+        ["2024-01-01 10:00:00", "2024-01-01 11:00:00"]
+    ).tolist()
+    assert df["value"].tolist() == [2.0, 1.0]
+
+
 def test_geotechnical_borehole_research():
     fname = os.path.join("tests", "data", "BHR000000353924.xml")
     bhrgt = brodata.bhr.GeotechnicalBoreholeResearch(fname)
@@ -1,5 +1,9 @@
 import os
 import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from pandas.testing import assert_frame_equal
 
 import brodata
 
@@ -37,6 +41,16 @@ def test_grondwaterstand_from_file():
     brodata.dino.Grondwaterstand(fname)
 
 
+def test_grondwaterstand_from_text():
+    fname = os.path.join("tests", "data", "B38B0207_001_full.csv")
+    with open(fname) as f:
+        text = f.read()
+    gws1 = brodata.dino.Grondwaterstand.from_text(text)
+    gws2 = brodata.dino.Grondwaterstand(fname)
+    assert_frame_equal(gws1.data, gws2.data)
+    assert gws1.props == gws2.props
+
+
 def test_oppervlaktewaterstand():
     brodata.dino.Oppervlaktewaterstand.from_dino_nr("P38G0010")
 
@@ -122,3 +136,41 @@ def test_get_boormonsterprofiel_within_extent():
 def test_get_oppervlaktewaterstanden_within_extent():
     extent = [116000, 121000, 434000, 442000]
     brodata.dino.get_oppervlaktewaterstand(extent)
+
+
+def test_cache_dir():
+    # serve the test-data locally, so the number of downloads can be counted
+    downloads = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(
+                *args, directory=os.path.join("tests", "data"), **kwargs
+            )
+
+        def do_GET(self):
+            downloads.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/B38B0207_001_full.csv"
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            gws1 = brodata.dino.Grondwaterstand(
+                url, redownload=False, cache_dir=cache_dir
+            )
+            # the second call should be answered from the cache
+            gws2 = brodata.dino.Grondwaterstand(
+                url, redownload=False, cache_dir=cache_dir
+            )
+            assert len(downloads) == 1
+            assert_frame_equal(gws1.data, gws2.data)
+            # redownload=True bypasses the cache
+            brodata.dino.Grondwaterstand(url, redownload=True, cache_dir=cache_dir)
+            assert len(downloads) == 2
+    finally:
+        server.shutdown()